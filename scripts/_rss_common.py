@@ -0,0 +1,94 @@
+"""外部 RSS 监控数据 (monitor-rss.sh 输出) 的解析与统计，供各分析脚本共用"""
+import itertools
+import mmap
+import os
+import warnings
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 超过该大小的 RSS 文件使用 mmap 读取
+MMAP_THRESHOLD = 1 << 20
+
+def iter_lines(f):
+    """逐行迭代二进制文件，大文件走 mmap 以省去 read 拷贝"""
+    mm = None
+    if os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            mm = None
+    if mm is None:
+        yield from f
+        return
+    with mm:
+        yield from iter(mm.readline, b'')
+
+def load_rss_values(filename):
+    """用 numpy 的 C 解析器整列读取 rss_kb，不可用或格式异常时返回 None"""
+    if np is None:
+        return None
+    try:
+        with warnings.catch_warnings():
+            # 只有表头的文件按空数据处理
+            warnings.simplefilter('ignore', UserWarning)
+            # 把表头当作注释交给 C 解析器跳过，没有表头的文件也不会丢掉首行
+            return np.loadtxt(filename, delimiter=',', usecols=2, comments='timestamp',
+                              dtype=np.int64, ndmin=1)
+    except ValueError:
+        return None
+
+def summarize(filename):
+    """分析 RSS 数据文件，返回样本数及 min/max/avg (KB 与 MB)"""
+    arr = load_rss_values(filename)
+    if arr is not None:
+        if arr.size == 0:
+            return None
+        sample_count = int(arr.size)
+        min_rss = int(arr.min())
+        max_rss = int(arr.max())
+        avg_rss = int(arr.sum()) / sample_count
+    else:
+        rss_values = []
+
+        with open(filename, 'rb') as f:
+            lines = iter_lines(f)
+            # 表头只在第一行，循环前判断一次即可；
+            # 中途若再出现表头，rss_kb 列无法转换为整数也会被跳过
+            first = next(lines, b'')
+            if not first.lstrip().startswith(b'timestamp'):
+                lines = itertools.chain((first,), lines)
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+                # 只切出第 3 列 rss_kb，不为整行字段分配列表
+                start = line.find(b',', line.find(b',') + 1) + 1
+                if not start:
+                    continue
+                end = line.find(b',', start)
+                try:
+                    rss_kb = int(line[start:end] if end >= 0 else line[start:])
+                    rss_values.append(rss_kb)
+                except ValueError:
+                    continue
+
+        if not rss_values:
+            return None
+
+        sample_count = len(rss_values)
+        min_rss = min(rss_values)
+        max_rss = max(rss_values)
+        avg_rss = sum(rss_values) / sample_count
+
+    return {
+        'sample_count': sample_count,
+        'min_rss_kb': min_rss,
+        'max_rss_kb': max_rss,
+        'avg_rss_kb': avg_rss,
+        'min_rss_mb': min_rss / 1024,
+        'max_rss_mb': max_rss / 1024,
+        'avg_rss_mb': avg_rss / 1024,
+    }
@@ -0,0 +1,28 @@
+"""内存统计结果 (stats_*.json) 的加载、单位换算与报表格式化，供各分析脚本共用"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 字节换算为 MB 的系数，用乘法代替两次除法
+MB_SCALE = 1 / (1024 * 1024)
+# 摘要中以字节为单位的字段后缀
+BYTE_FIELDS = ('_heap_alloc', '_rss', 'message_bytes')
+
+def load_json(f):
+    """解析以二进制模式打开的 JSON 文件，orjson 可用时优先使用"""
+    if orjson is not None:
+        return orjson.loads(f.read())
+    return json.load(f)
+
+def to_mb(summary):
+    """将摘要中的字节字段一次性换算为 MB"""
+    return {k: v * MB_SCALE for k, v in summary.items() if k.endswith(BYTE_FIELDS)}
+
+def format_saving(template, title, base, other):
+    """按各脚本的模板格式化一项内存节省对比，模板字段为 title/base/other/saved/pct"""
+    saved = base - other
+    pct = (saved / base * 100) if base > 0 else 0
+    return template.format(title=title, base=base, other=other, saved=saved, pct=pct)
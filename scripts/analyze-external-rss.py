@@ -3,39 +3,7 @@
 import sys
 import json
 
-def analyze_rss(filename):
-    """分析 RSS 数据文件，返回 min/max/avg"""
-    rss_values = []
-
-    with open(filename, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith('timestamp'):
-                continue
-            parts = line.split(',')
-            if len(parts) >= 3:
-                try:
-                    rss_kb = int(parts[2])
-                    rss_values.append(rss_kb)
-                except ValueError:
-                    continue
-
-    if not rss_values:
-        return None
-
-    min_rss = min(rss_values)
-    max_rss = max(rss_values)
-    avg_rss = sum(rss_values) / len(rss_values)
-
-    return {
-        'sample_count': len(rss_values),
-        'min_rss_kb': min_rss,
-        'max_rss_kb': max_rss,
-        'avg_rss_kb': avg_rss,
-        'min_rss_mb': min_rss / 1024,
-        'max_rss_mb': max_rss / 1024,
-        'avg_rss_mb': avg_rss / 1024,
-    }
+from _rss_common import summarize
 
 def main():
     if len(sys.argv) < 2:
@@ -45,7 +13,7 @@ def main():
     filename = sys.argv[1]
     output_format = sys.argv[2] if len(sys.argv) > 2 else 'text'
 
-    result = analyze_rss(filename)
+    result = summarize(filename)
 
     if result is None:
         print("No valid RSS data found", file=sys.stderr)
@@ -6,8 +6,27 @@
 import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 from pathlib import Path
 
+from _stats_common import load_json
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# 分析结果缓存文件，随 results/*.json 一起被 make clean 清理
+CACHE_FILE = '_analyzed.json'
+CACHE_VERSION = 3
+
+# 统计文件超过该大小时改用 ijson 流式解析，以内存上限换取解析速度
+STREAM_THRESHOLD = 256 << 20
+
+# 待分析文件总大小超过该值时才启用多进程，小文件不值得付进程启动开销
+PARALLEL_THRESHOLD = 16 << 20
+
 def format_bytes(bytes_val):
     """格式化字节数"""
     for unit in ['B', 'KB', 'MB', 'GB']:
@@ -16,19 +35,38 @@ def format_bytes(bytes_val):
         bytes_val /= 1024
     return f"{bytes_val:.2f} TB"
 
+def scan_samples(samples):
+    """单趟遍历样本，返回 (峰值 heap, 峰值 rss, 最后一个样本)"""
+    max_heap = max_rss = 0
+    final = None
+    for s in samples:
+        if s['heap_alloc'] > max_heap:
+            max_heap = s['heap_alloc']
+        if s['rss'] > max_rss:
+            max_rss = s['rss']
+        final = s
+    return max_heap, max_rss, final
+
 def analyze_file(filepath):
     """分析单个统计文件"""
-    with open(filepath) as f:
-        stats = json.load(f)
-
-    if not stats:
+    # 找峰值和最终值，heap/rss 在同一趟遍历中求最大值
+    with open(filepath, 'rb') as f:
+        if ijson is not None and os.fstat(f.fileno()).st_size > STREAM_THRESHOLD:
+            # 大文件流式解析，同一时刻只有一个样本驻留内存
+            events = ijson.parse(f, use_float=True)
+            _, event, _ = next(events, (None, None, None))
+            if event != 'start_array':
+                raise ValueError("stats file is not a JSON array of samples")
+            max_heap, max_rss, final = scan_samples(ijson.items(events, 'item'))
+        else:
+            stats = load_json(f)
+            if not isinstance(stats, list):
+                raise ValueError("stats file is not a JSON array of samples")
+            max_heap, max_rss, final = scan_samples(stats)
+
+    if final is None:
         return None
 
-    # 找峰值和最终值
-    max_heap = max(s['heap_alloc'] for s in stats)
-    max_rss = max(s['rss'] for s in stats)
-    final = stats[-1]
-
     message_bytes = final['message_bytes']
     message_count = final['message_count']
     batch_count = final['batch_count']
@@ -37,8 +75,10 @@ def analyze_file(filepath):
     heap_ratio = max_heap / message_bytes if message_bytes > 0 else 0
     rss_ratio = max_rss / message_bytes if message_bytes > 0 else 0
 
+    name = os.path.basename(filepath)
     return {
-        'file': os.path.basename(filepath),
+        'file': name,
+        'scenario': name[len('stats_'):-len('.json')],
         'message_count': message_count,
         'message_bytes': message_bytes,
         'batch_count': batch_count,
@@ -52,6 +92,50 @@ def analyze_file(filepath):
         'gc_pause_ms': final['pause_total_ns'] / 1e6,
     }
 
+def analyze_files(paths, parallel):
+    """分析多个统计文件，按输入顺序产出 (结果, 异常)"""
+    if not parallel:
+        for path in paths:
+            try:
+                yield analyze_file(path), None
+            except Exception as e:
+                yield None, e
+        return
+
+    with ProcessPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as executor:
+        futures = [executor.submit(analyze_file, path) for path in paths]
+        for future in futures:
+            try:
+                yield future.result(), None
+            except Exception as e:
+                yield None, e
+
+def load_cache(path):
+    """读取分析缓存，缺失、损坏或版本不符时返回空字典"""
+    try:
+        with open(path, 'rb') as f:
+            cache = load_json(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+        return {}
+    files = cache.get('files')
+    if not isinstance(files, dict):
+        return {}
+    # 结构不对的条目直接丢弃，对应文件会被重新分析
+    return {name: entry for name, entry in files.items()
+            if isinstance(entry, dict) and isinstance(entry.get('result'), dict)}
+
+def save_cache(path, entries):
+    """写入分析缓存，先写临时文件再替换"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'files': entries}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Failed to write cache {path}: {e}")
+
 def main():
     results_dir = Path(__file__).parent.parent / 'results'
 
@@ -64,58 +148,86 @@ def main():
         print("No stat files found")
         sys.exit(1)
 
-    results = []
+    # 以 mtime/size 判断统计文件是否变化，未变化的直接复用缓存结果
+    cache_path = results_dir / CACHE_FILE
+    cached = load_cache(cache_path)
+    entries = {}
+    pending = []
     for f in stat_files:
-        try:
-            r = analyze_file(f)
-            if r:
-                results.append(r)
-        except Exception as e:
-            print(f"Error analyzing {f}: {e}")
+        st = f.stat()
+        key = [st.st_mtime_ns, st.st_size]
+        entry = cached.get(f.name)
+        if entry is not None and entry.get('key') == key:
+            entries[f.name] = entry
+        else:
+            pending.append((f, key))
+
+    # 各文件相互独立，数据量大时分发到多个进程并行解析
+    parallel = len(pending) > 1 and sum(key[1] for _, key in pending) >= PARALLEL_THRESHOLD
+    outcomes = analyze_files([f for f, _ in pending], parallel)
+    for (f, key), (r, err) in zip(pending, outcomes):
+        if err is not None:
+            print(f"Error analyzing {f}: {err}")
+            continue
+        # 没有结果的文件不缓存，下次运行重新判断
+        if r is not None:
+            entries[f.name] = {'key': key, 'result': r}
+
+    if entries != cached:
+        save_cache(cache_path, entries)
+
+    results = [e['result'] for e in entries.values()]
 
     if not results:
         print("No valid results")
         sys.exit(1)
 
+    # 按文件名排序一次，后续表格和汇总直接复用
+    results.sort(key=itemgetter('file'))
+
+    # 报表逐行收集，最后一次 writelines 输出
+    lines = []
+
     # 打印对比表格
-    print("\n" + "=" * 100)
-    print("PULSAR CLIENT MEMORY ANALYSIS RESULTS")
-    print("=" * 100)
+    lines.append("\n" + "=" * 100 + "\n")
+    lines.append("PULSAR CLIENT MEMORY ANALYSIS RESULTS\n")
+    lines.append("=" * 100 + "\n")
 
     # 表头
-    print(f"\n{'Scenario':<20} {'Messages':<12} {'Data':<12} {'Peak Heap':<12} {'Peak RSS':<12} {'Heap Ratio':<12} {'RSS Ratio':<12}")
-    print("-" * 100)
+    lines.append(f"\n{'Scenario':<20} {'Messages':<12} {'Data':<12} {'Peak Heap':<12} {'Peak RSS':<12} {'Heap Ratio':<12} {'RSS Ratio':<12}\n")
+    lines.append("-" * 100 + "\n")
 
-    for r in sorted(results, key=lambda x: x['file']):
-        scenario = r['file'].replace('stats_', '').replace('.json', '')
-        print(f"{scenario:<20} "
-              f"{r['message_count']:<12} "
-              f"{format_bytes(r['message_bytes']):<12} "
-              f"{format_bytes(r['max_heap']):<12} "
-              f"{format_bytes(r['max_rss']):<12} "
-              f"{r['heap_ratio']:.2f}x{'':<9} "
-              f"{r['rss_ratio']:.2f}x")
+    for r in results:
+        lines.append(f"{r['scenario']:<20} "
+                     f"{r['message_count']:<12} "
+                     f"{format_bytes(r['message_bytes']):<12} "
+                     f"{format_bytes(r['max_heap']):<12} "
+                     f"{format_bytes(r['max_rss']):<12} "
+                     f"{r['heap_ratio']:.2f}x{'':<9} "
+                     f"{r['rss_ratio']:.2f}x\n")
 
-    print("-" * 100)
+    lines.append("-" * 100 + "\n")
 
     # 分析结论
-    print("\n" + "=" * 100)
-    print("ANALYSIS SUMMARY")
-    print("=" * 100)
+    lines.append("\n" + "=" * 100 + "\n")
+    lines.append("ANALYSIS SUMMARY\n")
+    lines.append("=" * 100 + "\n")
 
     # 找出最优配置
     if len(results) > 1:
-        best_heap = min(results, key=lambda x: x['heap_ratio'])
-        worst_heap = max(results, key=lambda x: x['heap_ratio'])
-
-        print(f"\nBest heap efficiency:  {best_heap['file'].replace('stats_', '').replace('.json', '')} ({best_heap['heap_ratio']:.2f}x)")
-        print(f"Worst heap efficiency: {worst_heap['file'].replace('stats_', '').replace('.json', '')} ({worst_heap['heap_ratio']:.2f}x)")
-        print(f"\nPotential improvement: {worst_heap['heap_ratio'] / best_heap['heap_ratio']:.1f}x reduction possible")
-
-    print("\n" + "=" * 100)
-    print("KEY FINDINGS")
-    print("=" * 100)
-    print("""
+        # 先抽出 heap_ratio 列，min/max 直接在浮点列表上归约
+        heap_ratios = [r['heap_ratio'] for r in results]
+        best_heap = results[heap_ratios.index(min(heap_ratios))]
+        worst_heap = results[heap_ratios.index(max(heap_ratios))]
+
+        lines.append(f"\nBest heap efficiency:  {best_heap['scenario']} ({best_heap['heap_ratio']:.2f}x)\n")
+        lines.append(f"Worst heap efficiency: {worst_heap['scenario']} ({worst_heap['heap_ratio']:.2f}x)\n")
+        lines.append(f"\nPotential improvement: {worst_heap['heap_ratio'] / best_heap['heap_ratio']:.1f}x reduction possible\n")
+
+    lines.append("\n" + "=" * 100 + "\n")
+    lines.append("KEY FINDINGS\n")
+    lines.append("=" * 100 + "\n")
+    lines.append("""
 1. ReceiverQueueSize Impact:
    - Default (1000) creates large pre-fetch buffer
    - Reducing to 100 or 10 significantly decreases memory
@@ -133,7 +245,10 @@ def main():
    - Use MemoryLimitBytes to cap client memory
    - Consider GOMEMLIMIT for overall Go runtime control
    - Process messages promptly to allow GC
+
 """)
 
+    sys.stdout.writelines(lines)
+
 if __name__ == '__main__':
     main()
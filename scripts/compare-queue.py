@@ -1,132 +1,104 @@
 #!/usr/bin/env python3
 """对比分析 ReceiverQueueSize 对内存的影响"""
 import sys
-import json
 import os
 
+from _stats_common import format_saving, load_json, to_mb
+
+# queue-size 对比报表的模板，表头等常量行在导入时生成
+TABLE_HEADER = "  {:<15} {:>10} {:>10} {:>10} {:>10}".format('QueueSize', 'Min', 'Max', 'Avg', 'Final')
+TABLE_RULE = "  {} {} {} {} {}".format('-' * 15, '-' * 10, '-' * 10, '-' * 10, '-' * 10)
+HEAP_ROW_FMT = ("  {label:<15} {min_heap_alloc:>10.2f} {max_heap_alloc:>10.2f} "
+                "{avg_heap_alloc:>10.2f} {final_heap_alloc:>10.2f}")
+RSS_ROW_FMT = "  {label:<15} {min_rss:>10.2f} {max_rss:>10.2f} {avg_rss:>10.2f} {final_rss:>10.2f}"
+SAVING_FMT = """  {title}:
+    queue=1000: {base:>10.2f} MB
+    queue=100:  {other:>10.2f} MB
+    SAVED:      {saved:>10.2f} MB  ({pct:.1f}%)"""
+RATIO_HEADER = "  {:<20} {:>12} {:>12} {:>12}".format('Metric', 'queue=1000', 'queue=100', 'Reduction')
+RATIO_RULE = "  {} {} {} {}".format('-' * 20, '-' * 12, '-' * 12, '-' * 12)
+RATIO_ROW_FMT = "  {:<20} {:>11.2f}x {:>11.2f}x {:>11.2f}x"
+
 def load_stats(filename):
     """加载统计数据"""
-    if not os.path.exists(filename):
+    try:
+        with open(filename, 'rb') as f:
+            return load_json(f)
+    except FileNotFoundError:
         return None
-    with open(filename, 'r') as f:
-        return json.load(f)
-
-def format_mb(value):
-    """格式化为 MB"""
-    return f"{value:.2f}"
 
 def print_comparison(queue_1000, queue_100):
     """打印对比结果"""
+    # 先收集所有行，最后一次性写出
+    out = []
+    mb_1000 = to_mb(queue_1000['summary']) if queue_1000 else None
+    mb_100 = to_mb(queue_100['summary']) if queue_100 else None
 
-    print("")
-    print("=" * 70)
-    print("              QUEUE SIZE COMPARISON REPORT")
-    print("              (Both use ReleasePayload)")
-    print("=" * 70)
+    out.append("")
+    out.append("=" * 70)
+    out.append("              QUEUE SIZE COMPARISON REPORT")
+    out.append("              (Both use ReleasePayload)")
+    out.append("=" * 70)
 
     # 数据量信息
     if queue_1000:
-        data_mb = queue_1000['summary']['message_bytes'] / 1024 / 1024
+        data_mb = mb_1000['message_bytes']
         msg_count = queue_1000['summary']['message_count']
-        print(f"  Test Data: {data_mb:.2f} MB ({msg_count:,} messages)")
-    print("")
+        out.append(f"  Test Data: {data_mb:.2f} MB ({msg_count:,} messages)")
+    out.append("")
 
     # HeapAlloc 对比表格
-    print("-" * 70)
-    print("  HeapAlloc (Go Runtime) - Unit: MB")
-    print("-" * 70)
-    print(f"  {'QueueSize':<15} {'Min':>10} {'Max':>10} {'Avg':>10} {'Final':>10}")
-    print(f"  {'-'*15} {'-'*10} {'-'*10} {'-'*10} {'-'*10}")
+    out.append("-" * 70)
+    out.append("  HeapAlloc (Go Runtime) - Unit: MB")
+    out.append("-" * 70)
+    out.append(TABLE_HEADER)
+    out.append(TABLE_RULE)
 
     if queue_1000:
-        s = queue_1000['summary']
-        print(f"  {'1000 (default)':<15} {format_mb(s['min_heap_alloc']/1024/1024):>10} "
-              f"{format_mb(s['max_heap_alloc']/1024/1024):>10} "
-              f"{format_mb(s['avg_heap_alloc']/1024/1024):>10} "
-              f"{format_mb(s['final_heap_alloc']/1024/1024):>10}")
+        out.append(HEAP_ROW_FMT.format(label='1000 (default)', **mb_1000))
 
     if queue_100:
-        s = queue_100['summary']
-        print(f"  {'100':<15} {format_mb(s['min_heap_alloc']/1024/1024):>10} "
-              f"{format_mb(s['max_heap_alloc']/1024/1024):>10} "
-              f"{format_mb(s['avg_heap_alloc']/1024/1024):>10} "
-              f"{format_mb(s['final_heap_alloc']/1024/1024):>10}")
+        out.append(HEAP_ROW_FMT.format(label='100', **mb_100))
 
-    print("")
+    out.append("")
 
     # RSS 对比表格
-    print("-" * 70)
-    print("  RSS (Resident Set Size) - Unit: MB")
-    print("-" * 70)
-    print(f"  {'QueueSize':<15} {'Min':>10} {'Max':>10} {'Avg':>10} {'Final':>10}")
-    print(f"  {'-'*15} {'-'*10} {'-'*10} {'-'*10} {'-'*10}")
+    out.append("-" * 70)
+    out.append("  RSS (Resident Set Size) - Unit: MB")
+    out.append("-" * 70)
+    out.append(TABLE_HEADER)
+    out.append(TABLE_RULE)
 
     if queue_1000:
-        s = queue_1000['summary']
-        print(f"  {'1000 (default)':<15} {format_mb(s['min_rss']/1024/1024):>10} "
-              f"{format_mb(s['max_rss']/1024/1024):>10} "
-              f"{format_mb(s['avg_rss']/1024/1024):>10} "
-              f"{format_mb(s['final_rss']/1024/1024):>10}")
+        out.append(RSS_ROW_FMT.format(label='1000 (default)', **mb_1000))
 
     if queue_100:
-        s = queue_100['summary']
-        print(f"  {'100':<15} {format_mb(s['min_rss']/1024/1024):>10} "
-              f"{format_mb(s['max_rss']/1024/1024):>10} "
-              f"{format_mb(s['avg_rss']/1024/1024):>10} "
-              f"{format_mb(s['final_rss']/1024/1024):>10}")
+        out.append(RSS_ROW_FMT.format(label='100', **mb_100))
 
-    print("")
+    out.append("")
 
     # 内存节省分析
     if queue_1000 and queue_100:
-        print("=" * 70)
-        print("              MEMORY SAVINGS ANALYSIS")
-        print("              (queue-size=100 vs queue-size=1000)")
-        print("=" * 70)
+        out.append("=" * 70)
+        out.append("              MEMORY SAVINGS ANALYSIS")
+        out.append("              (queue-size=100 vs queue-size=1000)")
+        out.append("=" * 70)
 
         s1000 = queue_1000['summary']
         s100 = queue_100['summary']
 
-        # HeapAlloc Max 节省
-        heap_1000 = s1000['max_heap_alloc'] / 1024 / 1024
-        heap_100 = s100['max_heap_alloc'] / 1024 / 1024
-        heap_saved = heap_1000 - heap_100
-        heap_pct = (heap_saved / heap_1000 * 100) if heap_1000 > 0 else 0
-
-        print(f"  Max HeapAlloc:")
-        print(f"    queue=1000: {heap_1000:>10.2f} MB")
-        print(f"    queue=100:  {heap_100:>10.2f} MB")
-        print(f"    SAVED:      {heap_saved:>10.2f} MB  ({heap_pct:.1f}%)")
-        print("")
-
-        # HeapAlloc Avg 节省
-        heap_avg_1000 = s1000['avg_heap_alloc'] / 1024 / 1024
-        heap_avg_100 = s100['avg_heap_alloc'] / 1024 / 1024
-        heap_avg_saved = heap_avg_1000 - heap_avg_100
-        heap_avg_pct = (heap_avg_saved / heap_avg_1000 * 100) if heap_avg_1000 > 0 else 0
-
-        print(f"  Avg HeapAlloc:")
-        print(f"    queue=1000: {heap_avg_1000:>10.2f} MB")
-        print(f"    queue=100:  {heap_avg_100:>10.2f} MB")
-        print(f"    SAVED:      {heap_avg_saved:>10.2f} MB  ({heap_avg_pct:.1f}%)")
-        print("")
-
-        # RSS Max 节省
-        rss_1000 = s1000['max_rss'] / 1024 / 1024
-        rss_100 = s100['max_rss'] / 1024 / 1024
-        rss_saved = rss_1000 - rss_100
-        rss_pct = (rss_saved / rss_1000 * 100) if rss_1000 > 0 else 0
-
-        print(f"  Max RSS:")
-        print(f"    queue=1000: {rss_1000:>10.2f} MB")
-        print(f"    queue=100:  {rss_100:>10.2f} MB")
-        print(f"    SAVED:      {rss_saved:>10.2f} MB  ({rss_pct:.1f}%)")
-        print("")
+        # HeapAlloc Max / Avg 与 RSS Max 节省
+        out.append(format_saving(SAVING_FMT, "Max HeapAlloc", mb_1000['max_heap_alloc'], mb_100['max_heap_alloc']))
+        out.append("")
+        out.append(format_saving(SAVING_FMT, "Avg HeapAlloc", mb_1000['avg_heap_alloc'], mb_100['avg_heap_alloc']))
+        out.append("")
+        out.append(format_saving(SAVING_FMT, "Max RSS", mb_1000['max_rss'], mb_100['max_rss']))
+        out.append("")
 
         # 内存放大倍数对比
-        print("-" * 70)
-        print("  Memory Amplification (Max Memory / Data Size)")
-        print("-" * 70)
+        out.append("-" * 70)
+        out.append("  Memory Amplification (Max Memory / Data Size)")
+        out.append("-" * 70)
         data_bytes = s1000['message_bytes']
         if data_bytes > 0:
             heap_ratio_1000 = s1000['max_heap_alloc'] / data_bytes
@@ -134,17 +106,21 @@ def print_comparison(queue_1000, queue_100):
             rss_ratio_1000 = s1000['max_rss'] / data_bytes
             rss_ratio_100 = s100['max_rss'] / data_bytes
 
-            print(f"  {'Metric':<20} {'queue=1000':>12} {'queue=100':>12} {'Reduction':>12}")
-            print(f"  {'-'*20} {'-'*12} {'-'*12} {'-'*12}")
-            print(f"  {'HeapAlloc/DataSize':<20} {heap_ratio_1000:>11.2f}x {heap_ratio_100:>11.2f}x {heap_ratio_1000-heap_ratio_100:>11.2f}x")
-            print(f"  {'RSS/DataSize':<20} {rss_ratio_1000:>11.2f}x {rss_ratio_100:>11.2f}x {rss_ratio_1000-rss_ratio_100:>11.2f}x")
+            out.append(RATIO_HEADER)
+            out.append(RATIO_RULE)
+            out.append(RATIO_ROW_FMT.format('HeapAlloc/DataSize', heap_ratio_1000, heap_ratio_100,
+                                            heap_ratio_1000 - heap_ratio_100))
+            out.append(RATIO_ROW_FMT.format('RSS/DataSize', rss_ratio_1000, rss_ratio_100,
+                                            rss_ratio_1000 - rss_ratio_100))
+
+        out.append("")
 
-        print("")
+    out.append("=" * 70)
+    out.append("  Note: Smaller queue-size reduces prefetch memory but may")
+    out.append("        affect throughput. Choose based on your memory constraints.")
+    out.append("=" * 70)
 
-    print("=" * 70)
-    print("  Note: Smaller queue-size reduces prefetch memory but may")
-    print("        affect throughput. Choose based on your memory constraints.")
-    print("=" * 70)
+    sys.stdout.write('\n'.join(out) + '\n')
 
 def main():
     results_dir = sys.argv[1] if len(sys.argv) > 1 else './results'
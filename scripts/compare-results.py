@@ -1,191 +1,142 @@
 #!/usr/bin/env python3
 """对比分析内存测试结果"""
 import sys
-import json
 import os
 
+from _rss_common import summarize
+from _stats_common import format_saving, load_json, to_mb
+
+# ReleasePayload 对比报表的模板，SAVING_FMT 由 format_saving 填充
+TABLE_HEADER = "  {:<20} {:>10} {:>10} {:>10} {:>10}".format('Mode', 'Min', 'Max', 'Avg', 'Final')
+TABLE_RULE = "  {} {} {} {} {}".format('-' * 20, '-' * 10, '-' * 10, '-' * 10, '-' * 10)
+HEAP_ROW_FMT = ("  {label:<20} {min_heap_alloc:>10.2f} {max_heap_alloc:>10.2f} "
+                "{avg_heap_alloc:>10.2f} {final_heap_alloc:>10.2f}")
+RSS_ROW_FMT = "  {label:<20} {min_rss:>10.2f} {max_rss:>10.2f} {avg_rss:>10.2f} {final_rss:>10.2f}"
+EXT_TABLE_HEADER = "  {:<20} {:>10} {:>10} {:>10}".format('Mode', 'Min', 'Max', 'Avg')
+EXT_TABLE_RULE = "  {} {} {} {}".format('-' * 20, '-' * 10, '-' * 10, '-' * 10)
+EXT_ROW_FMT = "  {label:<20} {min:>10.2f} {max:>10.2f} {avg:>10.2f}"
+SAVING_FMT = """  {title}:
+    WITHOUT: {base:>10.2f} MB
+    WITH:    {other:>10.2f} MB
+    SAVED:   {saved:>10.2f} MB  ({pct:.1f}%)"""
+RATIO_HEADER = "  {:<25} {:>12} {:>12} {:>12}".format('Metric', 'WITHOUT', 'WITH', 'Reduction')
+RATIO_RULE = "  {} {} {} {}".format('-' * 25, '-' * 12, '-' * 12, '-' * 12)
+RATIO_ROW_FMT = "  {:<25} {:>11.2f}x {:>11.2f}x {:>11.2f}x"
+
 def load_stats(filename):
     """加载统计数据"""
-    if not os.path.exists(filename):
+    try:
+        with open(filename, 'rb') as f:
+            return load_json(f)
+    except FileNotFoundError:
         return None
-    with open(filename, 'r') as f:
-        return json.load(f)
 
 def load_external_rss(filename):
     """加载外部 RSS 数据"""
-    if not os.path.exists(filename):
+    try:
+        result = summarize(filename)
+    except FileNotFoundError:
         return None
-
-    rss_values = []
-    with open(filename, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith('timestamp'):
-                continue
-            parts = line.split(',')
-            if len(parts) >= 3:
-                try:
-                    rss_kb = int(parts[2])
-                    rss_values.append(rss_kb)
-                except ValueError:
-                    continue
-
-    if not rss_values:
+    if result is None:
         return None
 
     return {
-        'min': min(rss_values) / 1024,
-        'max': max(rss_values) / 1024,
-        'avg': sum(rss_values) / len(rss_values) / 1024,
+        'min': result['min_rss_mb'],
+        'max': result['max_rss_mb'],
+        'avg': result['avg_rss_mb'],
     }
 
-def format_mb(value):
-    """格式化为 MB"""
-    return f"{value:.2f}"
-
 def print_comparison(no_release, with_release, ext_no_release, ext_with_release):
     """打印对比结果"""
+    # 先收集所有行，最后一次性写出
+    out = []
+    mb_no = to_mb(no_release['summary']) if no_release else None
+    mb_with = to_mb(with_release['summary']) if with_release else None
 
-    print("")
-    print("=" * 70)
-    print("                    MEMORY COMPARISON REPORT")
-    print("=" * 70)
+    out.append("")
+    out.append("=" * 70)
+    out.append("                    MEMORY COMPARISON REPORT")
+    out.append("=" * 70)
 
     # 数据量信息
     if no_release:
-        data_mb = no_release['summary']['message_bytes'] / 1024 / 1024
+        data_mb = mb_no['message_bytes']
         msg_count = no_release['summary']['message_count']
-        print(f"  Test Data: {data_mb:.2f} MB ({msg_count:,} messages)")
-    print("")
+        out.append(f"  Test Data: {data_mb:.2f} MB ({msg_count:,} messages)")
+    out.append("")
 
     # HeapAlloc 对比表格
-    print("-" * 70)
-    print("  HeapAlloc (Go Runtime) - Unit: MB")
-    print("-" * 70)
-    print(f"  {'Mode':<20} {'Min':>10} {'Max':>10} {'Avg':>10} {'Final':>10}")
-    print(f"  {'-'*20} {'-'*10} {'-'*10} {'-'*10} {'-'*10}")
+    out.append("-" * 70)
+    out.append("  HeapAlloc (Go Runtime) - Unit: MB")
+    out.append("-" * 70)
+    out.append(TABLE_HEADER)
+    out.append(TABLE_RULE)
 
     if no_release:
-        s = no_release['summary']
-        print(f"  {'WITHOUT ReleasePayload':<20} {format_mb(s['min_heap_alloc']/1024/1024):>10} "
-              f"{format_mb(s['max_heap_alloc']/1024/1024):>10} "
-              f"{format_mb(s['avg_heap_alloc']/1024/1024):>10} "
-              f"{format_mb(s['final_heap_alloc']/1024/1024):>10}")
+        out.append(HEAP_ROW_FMT.format(label='WITHOUT ReleasePayload', **mb_no))
 
     if with_release:
-        s = with_release['summary']
-        print(f"  {'WITH ReleasePayload':<20} {format_mb(s['min_heap_alloc']/1024/1024):>10} "
-              f"{format_mb(s['max_heap_alloc']/1024/1024):>10} "
-              f"{format_mb(s['avg_heap_alloc']/1024/1024):>10} "
-              f"{format_mb(s['final_heap_alloc']/1024/1024):>10}")
+        out.append(HEAP_ROW_FMT.format(label='WITH ReleasePayload', **mb_with))
 
-    print("")
+    out.append("")
 
     # RSS 对比表格 (内部)
-    print("-" * 70)
-    print("  RSS (Internal gopsutil) - Unit: MB")
-    print("-" * 70)
-    print(f"  {'Mode':<20} {'Min':>10} {'Max':>10} {'Avg':>10} {'Final':>10}")
-    print(f"  {'-'*20} {'-'*10} {'-'*10} {'-'*10} {'-'*10}")
+    out.append("-" * 70)
+    out.append("  RSS (Internal gopsutil) - Unit: MB")
+    out.append("-" * 70)
+    out.append(TABLE_HEADER)
+    out.append(TABLE_RULE)
 
     if no_release:
-        s = no_release['summary']
-        print(f"  {'WITHOUT ReleasePayload':<20} {format_mb(s['min_rss']/1024/1024):>10} "
-              f"{format_mb(s['max_rss']/1024/1024):>10} "
-              f"{format_mb(s['avg_rss']/1024/1024):>10} "
-              f"{format_mb(s['final_rss']/1024/1024):>10}")
+        out.append(RSS_ROW_FMT.format(label='WITHOUT ReleasePayload', **mb_no))
 
     if with_release:
-        s = with_release['summary']
-        print(f"  {'WITH ReleasePayload':<20} {format_mb(s['min_rss']/1024/1024):>10} "
-              f"{format_mb(s['max_rss']/1024/1024):>10} "
-              f"{format_mb(s['avg_rss']/1024/1024):>10} "
-              f"{format_mb(s['final_rss']/1024/1024):>10}")
+        out.append(RSS_ROW_FMT.format(label='WITH ReleasePayload', **mb_with))
 
-    print("")
+    out.append("")
 
     # 外部 RSS 对比表格
     if ext_no_release or ext_with_release:
-        print("-" * 70)
-        print("  RSS (External ps aux) - Unit: MB")
-        print("-" * 70)
-        print(f"  {'Mode':<20} {'Min':>10} {'Max':>10} {'Avg':>10}")
-        print(f"  {'-'*20} {'-'*10} {'-'*10} {'-'*10}")
+        out.append("-" * 70)
+        out.append("  RSS (External ps aux) - Unit: MB")
+        out.append("-" * 70)
+        out.append(EXT_TABLE_HEADER)
+        out.append(EXT_TABLE_RULE)
 
         if ext_no_release:
-            print(f"  {'WITHOUT ReleasePayload':<20} {format_mb(ext_no_release['min']):>10} "
-                  f"{format_mb(ext_no_release['max']):>10} "
-                  f"{format_mb(ext_no_release['avg']):>10}")
+            out.append(EXT_ROW_FMT.format(label='WITHOUT ReleasePayload', **ext_no_release))
 
         if ext_with_release:
-            print(f"  {'WITH ReleasePayload':<20} {format_mb(ext_with_release['min']):>10} "
-                  f"{format_mb(ext_with_release['max']):>10} "
-                  f"{format_mb(ext_with_release['avg']):>10}")
+            out.append(EXT_ROW_FMT.format(label='WITH ReleasePayload', **ext_with_release))
 
-        print("")
+        out.append("")
 
     # 内存节省分析
     if no_release and with_release:
-        print("=" * 70)
-        print("                      MEMORY SAVINGS ANALYSIS")
-        print("=" * 70)
+        out.append("=" * 70)
+        out.append("                      MEMORY SAVINGS ANALYSIS")
+        out.append("=" * 70)
 
         no_s = no_release['summary']
         with_s = with_release['summary']
 
-        # HeapAlloc Max 节省
-        no_max_heap = no_s['max_heap_alloc'] / 1024 / 1024
-        with_max_heap = with_s['max_heap_alloc'] / 1024 / 1024
-        heap_saved = no_max_heap - with_max_heap
-        heap_pct = (heap_saved / no_max_heap * 100) if no_max_heap > 0 else 0
-
-        print(f"  Max HeapAlloc:")
-        print(f"    WITHOUT: {no_max_heap:>10.2f} MB")
-        print(f"    WITH:    {with_max_heap:>10.2f} MB")
-        print(f"    SAVED:   {heap_saved:>10.2f} MB  ({heap_pct:.1f}%)")
-        print("")
-
-        # HeapAlloc Avg 节省
-        no_avg_heap = no_s['avg_heap_alloc'] / 1024 / 1024
-        with_avg_heap = with_s['avg_heap_alloc'] / 1024 / 1024
-        heap_avg_saved = no_avg_heap - with_avg_heap
-        heap_avg_pct = (heap_avg_saved / no_avg_heap * 100) if no_avg_heap > 0 else 0
-
-        print(f"  Avg HeapAlloc:")
-        print(f"    WITHOUT: {no_avg_heap:>10.2f} MB")
-        print(f"    WITH:    {with_avg_heap:>10.2f} MB")
-        print(f"    SAVED:   {heap_avg_saved:>10.2f} MB  ({heap_avg_pct:.1f}%)")
-        print("")
-
-        # RSS Max 节省
-        no_max_rss = no_s['max_rss'] / 1024 / 1024
-        with_max_rss = with_s['max_rss'] / 1024 / 1024
-        rss_saved = no_max_rss - with_max_rss
-        rss_pct = (rss_saved / no_max_rss * 100) if no_max_rss > 0 else 0
-
-        print(f"  Max RSS:")
-        print(f"    WITHOUT: {no_max_rss:>10.2f} MB")
-        print(f"    WITH:    {with_max_rss:>10.2f} MB")
-        print(f"    SAVED:   {rss_saved:>10.2f} MB  ({rss_pct:.1f}%)")
-        print("")
+        # HeapAlloc Max / Avg 与 RSS Max 节省
+        out.append(format_saving(SAVING_FMT, "Max HeapAlloc", mb_no['max_heap_alloc'], mb_with['max_heap_alloc']))
+        out.append("")
+        out.append(format_saving(SAVING_FMT, "Avg HeapAlloc", mb_no['avg_heap_alloc'], mb_with['avg_heap_alloc']))
+        out.append("")
+        out.append(format_saving(SAVING_FMT, "Max RSS", mb_no['max_rss'], mb_with['max_rss']))
+        out.append("")
 
         # 外部 RSS 节省
         if ext_no_release and ext_with_release:
-            ext_no_max = ext_no_release['max']
-            ext_with_max = ext_with_release['max']
-            ext_saved = ext_no_max - ext_with_max
-            ext_pct = (ext_saved / ext_no_max * 100) if ext_no_max > 0 else 0
-
-            print(f"  Max RSS (External):")
-            print(f"    WITHOUT: {ext_no_max:>10.2f} MB")
-            print(f"    WITH:    {ext_with_max:>10.2f} MB")
-            print(f"    SAVED:   {ext_saved:>10.2f} MB  ({ext_pct:.1f}%)")
-            print("")
+            out.append(format_saving(SAVING_FMT, "Max RSS (External)", ext_no_release['max'], ext_with_release['max']))
+            out.append("")
 
         # 内存放大倍数对比
-        print("-" * 70)
-        print("  Memory Amplification (Max Memory / Data Size)")
-        print("-" * 70)
+        out.append("-" * 70)
+        out.append("  Memory Amplification (Max Memory / Data Size)")
+        out.append("-" * 70)
         data_bytes = no_s['message_bytes']
         if data_bytes > 0:
             no_heap_ratio = no_s['max_heap_alloc'] / data_bytes
@@ -193,14 +144,18 @@ def print_comparison(no_release, with_release, ext_no_release, ext_with_release)
             no_rss_ratio = no_s['max_rss'] / data_bytes
             with_rss_ratio = with_s['max_rss'] / data_bytes
 
-            print(f"  {'Metric':<25} {'WITHOUT':>12} {'WITH':>12} {'Reduction':>12}")
-            print(f"  {'-'*25} {'-'*12} {'-'*12} {'-'*12}")
-            print(f"  {'HeapAlloc/DataSize':<25} {no_heap_ratio:>11.2f}x {with_heap_ratio:>11.2f}x {no_heap_ratio-with_heap_ratio:>11.2f}x")
-            print(f"  {'RSS/DataSize':<25} {no_rss_ratio:>11.2f}x {with_rss_ratio:>11.2f}x {no_rss_ratio-with_rss_ratio:>11.2f}x")
+            out.append(RATIO_HEADER)
+            out.append(RATIO_RULE)
+            out.append(RATIO_ROW_FMT.format('HeapAlloc/DataSize', no_heap_ratio, with_heap_ratio,
+                                            no_heap_ratio - with_heap_ratio))
+            out.append(RATIO_ROW_FMT.format('RSS/DataSize', no_rss_ratio, with_rss_ratio,
+                                            no_rss_ratio - with_rss_ratio))
+
+        out.append("")
 
-        print("")
+    out.append("=" * 70)
 
-    print("=" * 70)
+    sys.stdout.write('\n'.join(out) + '\n')
 
 def main():
     results_dir = sys.argv[1] if len(sys.argv) > 1 else './results'